@@ -1,10 +1,17 @@
-from telegram import Bot
 import os
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
-bot = Bot(token=BOT_TOKEN)
+_bot = None
 
-def send_alert(text):
-    bot.send_message(chat_id=CHAT_ID, text=text)
+def get_bot():
+    # telegram فقط وقتی واقعاً پیامی ارسال شود import می‌شود
+    global _bot
+    if _bot is None:
+        from telegram import Bot
+        _bot = Bot(token=BOT_TOKEN)
+    return _bot
+
+async def send_alert(text):
+    await get_bot().send_message(chat_id=CHAT_ID, text=text)
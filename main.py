@@ -1,9 +1,10 @@
 import os
-import threading
 import asyncio
+import threading
 from http.server import HTTPServer, BaseHTTPRequestHandler
 
 from telegram.ext import (
+    AIORateLimiter,
     ApplicationBuilder,
     CommandHandler,
 )
@@ -14,9 +15,19 @@ from telegram_commands import (
     wallets,
     threshold,
     status,
+    refresh,
 )
 
 from solana_trade_monitor import monitor
+import solana_rpc
+from wallet_store import get_wallets
+
+# uvloop اختیاری است (روی ویندوز نصب نمی‌شود)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
 
 
 # ======================
@@ -45,7 +56,25 @@ CHAT_ID = int(os.getenv("CHAT_ID"))
 if not TOKEN:
     raise RuntimeError("❌ BOT_TOKEN is not set")
 
-app = ApplicationBuilder().token(TOKEN).build()
+# محدودیت نرخ تلگرام (30 پیام در ثانیه، 20 پیام در دقیقه برای گروه)
+# و تا 3 بار تلاش مجدد بعد از RetryAfter (429)
+app = (
+    ApplicationBuilder()
+    .token(TOKEN)
+    .concurrent_updates(True)
+    .http_version("2")
+    .pool_timeout(5)
+    .rate_limiter(
+        AIORateLimiter(
+            overall_max_rate=30,
+            overall_time_period=1,
+            group_max_rate=20,
+            group_time_period=60,
+            max_retries=3,
+        )
+    )
+    .build()
+)
 
 # --- Commands ---
 app.add_handler(CommandHandler("addwallet", addwallet))
@@ -53,17 +82,15 @@ app.add_handler(CommandHandler("removewallet", removewallet))
 app.add_handler(CommandHandler("wallets", wallets))
 app.add_handler(CommandHandler("setthreshold", threshold))
 app.add_handler(CommandHandler("status", status))
+app.add_handler(CommandHandler("refresh", refresh))
 
 
 # ======================
 # Start Solana Trade Monitor
 # ======================
 async def start_trade_monitor(application):
-    async def get_wallets():
-        # والت‌ها از حافظه bot_data
-        return application.bot_data.get("wallets", [])
-
-    asyncio.create_task(
+    # هندل تسک در bot_data نگه داشته می‌شود
+    application.bot_data["monitor_task"] = asyncio.create_task(
         monitor(
             wallets=get_wallets,
             bot=application.bot,
@@ -71,8 +98,20 @@ async def start_trade_monitor(application):
         )
     )
 
-app.post_init = start_trade_monitor
+async def stop_trade_monitor(application):
+    # قبل از Application.shutdown اجرا می‌شود؛ ربات و rate limiter هنوز باز هستند
+    task = application.bot_data.get("monitor_task")
+    if task:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
 
+async def close_rpc_client(application):
+    # اتصال‌های keep-alive به RPC بسته می‌شوند
+    await solana_rpc.close()
+
+app.post_init = start_trade_monitor
+app.post_stop = stop_trade_monitor
+app.post_shutdown = close_rpc_client
 
 print("🤖 Bot is running (Render Free Mode + Solana Trade Monitor)...")
 app.run_polling()
@@ -1,41 +1,21 @@
 import asyncio
 import time
-import requests
 
-SOLANA_RPC = "https://api.mainnet-beta.solana.com"
+from solana_rpc import get_signatures, get_transaction
+
 CHECK_INTERVAL = 30  # ثانیه
 MIN_SOL = 50  # فیلتر نهنگ (50 SOL)
 
 # ذخیره آخرین امضا
 last_signatures = {}
 
-def get_signatures(address):
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getSignaturesForAddress",
-        "params": [address, {"limit": 5}]
-    }
-    r = requests.post(SOLANA_RPC, json=payload, timeout=10)
-    return r.json().get("result", [])
-
-def get_transaction(signature):
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getTransaction",
-        "params": [signature, {"encoding": "jsonParsed"}]
-    }
-    r = requests.post(SOLANA_RPC, json=payload, timeout=10)
-    return r.json().get("result")
-
 async def monitor(wallets, bot, chat_id):
     global last_signatures
 
     while True:
         for wallet in wallets():
             try:
-                sigs = get_signatures(wallet)
+                sigs = await get_signatures(wallet)
                 if not sigs:
                     continue
 
@@ -45,7 +25,7 @@ async def monitor(wallets, bot, chat_id):
                     continue
 
                 last_signatures[wallet] = latest_sig
-                tx = get_transaction(latest_sig)
+                tx = await get_transaction(latest_sig)
                 if not tx:
                     continue
 
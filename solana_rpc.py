@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    from json import dumps as json_dumps, loads as json_loads
+
+SOLANA_RPC = "https://api.mainnet-beta.solana.com"
+REQUEST_TIMEOUT = 10
+MAX_CONCURRENT_REQUESTS = 20
+
+# فقط meta لازم است؛ base64 از برگرداندن کل دستورالعمل‌های parse‌شده جلوگیری می‌کند
+_TX_OPTIONS = {
+    "encoding": "base64",
+    "maxSupportedTransactionVersion": 0,
+}
+
+# یک کلاینت مشترک تا اتصال‌های keep-alive بین پول‌ها حفظ شوند
+CLIENT = httpx.AsyncClient(
+    timeout=REQUEST_TIMEOUT,
+    headers={
+        "User-Agent": "makan-telegram-bot/1.0",
+        "Content-Type": "application/json",
+    },
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=20,
+            keepalive_expiry=60,
+        ),
+        retries=3,
+    ),
+)
+
+# RPC عمومی سولانا محدودیت نرخ دارد؛ تعداد درخواست همزمان محدود می‌شود
+_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+async def rpc_call(method, params):
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": method,
+        "params": params
+    }
+    async with _semaphore:
+        r = await CLIENT.post(SOLANA_RPC, content=json_dumps(payload))
+    return json_loads(r.content).get("result")
+
+async def get_signatures(address, limit=5, until=None):
+    options = {"limit": limit}
+    if until:
+        # فقط امضاهای جدیدتر از until برگردانده می‌شوند
+        options["until"] = until
+    return await rpc_call(
+        "getSignaturesForAddress",
+        [address, options]
+    ) or []
+
+async def get_transaction(sig):
+    return await rpc_call(
+        "getTransaction",
+        [sig, _TX_OPTIONS]
+    )
+
+async def close():
+    await CLIENT.aclose()
@@ -1,103 +1,218 @@
 import asyncio
-import requests
+import functools
+import os
+import time
+
+from solana_rpc import get_signatures, get_transaction
 
-SOLANA_RPC = "https://api.mainnet-beta.solana.com"
 CHECK_INTERVAL = 30
-MIN_SOL = 1  # برای تست کم گذاشتم
+MIN_SOL = float(os.environ.get("MIN_SOL", "1"))  # با /setthreshold قابل تغییر
+MAX_CONCURRENT_SENDS = 30  # سقف سراسری تلگرام ~30 پیام در ثانیه
+
+# آستانه یک بار به lamports تبدیل می‌شود، نه برای هر تراکنش
+_min_lamports = int(MIN_SOL * 1e9)
+
+_format_trade = (
+    "{action} **Solana Trade**\n\n"
+    "Wallet:\n`{wallet}`\n\n"
+    "Token Mint:\n`{mint}`\n"
+    "Token Amount: {amount:,.2f}\n"
+    "SOL Change: {sol:.2f} SOL\n\n"
+    "🔗 Links:\n"
+    "Solscan: https://solscan.io/tx/{sig}\n"
+    "GMGN: https://gmgn.ai/sol/token/{mint}\n"
+    "HyperDash: https://hyperdash.info/solana/token/{mint}"
+).format
 
 last_signatures = {}
-
-def rpc_call(method, params):
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": method,
-        "params": params
-    }
-    r = requests.post(SOLANA_RPC, json=payload, timeout=10)
-    return r.json().get("result")
-
-def get_signatures(address):
-    return rpc_call(
-        "getSignaturesForAddress",
-        [address, {"limit": 5}]
-    ) or []
-
-def get_transaction(sig):
-    return rpc_call(
-        "getTransaction",
-        [sig, {"encoding": "jsonParsed"}]
+_send_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+_wake_event = asyncio.Event()
+
+def get_min_sol():
+    return MIN_SOL
+
+def set_min_sol(value):
+    global MIN_SOL, _min_lamports
+    MIN_SOL = value
+    _min_lamports = int(value * 1e9)
+
+def wake():
+    # مانیتور را بدون منتظر ماندن برای CHECK_INTERVAL بیدار می‌کند
+    _wake_event.set()
+
+async def wait_next_cycle(delay):
+    # True یعنی انتظار با wake() زودتر تمام شده است
+    try:
+        await asyncio.wait_for(_wake_event.wait(), timeout=delay)
+        woken = True
+    except asyncio.TimeoutError:
+        woken = False
+    _wake_event.clear()
+    return woken
+
+def safe_fetcher(name):
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrap(wallet):
+            try:
+                return await fn(wallet)
+            except Exception as e:
+                print(f"{name} failed for {wallet}:", e)
+                return None
+        return wrap
+    return deco
+
+@safe_fetcher("Trade monitor")
+async def fetch_latest_trade(wallet):
+    sigs = await get_signatures(
+        wallet, limit=1, until=last_signatures.get(wallet)
+    )
+    if not sigs:
+        return None
+
+    sig = sigs[0]["signature"]
+    if last_signatures.get(wallet) == sig:
+        return None
+
+    last_signatures[wallet] = sig
+
+    # تراکنش ناموفق ترید نیست؛ getTransaction لازم نیست
+    if sigs[0].get("err") is not None:
+        return None
+
+    tx = await get_transaction(sig)
+    if not tx or not tx.get("meta"):
+        return None
+
+    return sig, tx
+
+def prune_last_signatures(current):
+    # والت‌های حذف‌شده از حافظه پاک می‌شوند تا دیکشنری بی‌نهایت بزرگ نشود
+    if len(last_signatures) <= len(current):
+        return
+    keep = set(current)
+    for wallet in [w for w in last_signatures if w not in keep]:
+        del last_signatures[wallet]
+
+def token_amounts(balances, owner):
+    # فقط حساب‌های توکن خود والت؛ حساب pool با همان mint نباید جای آن را بگیرد
+    amounts = {}
+    for t in balances:
+        if t.get("owner") != owner:
+            continue
+        # uiAmount از JSON خودش عدد است (یا null)؛ float() لازم نیست
+        mint = t["mint"]
+        amounts[mint] = amounts.get(mint, 0) + (t["uiTokenAmount"]["uiAmount"] or 0)
+    return amounts
+
+def token_changes(pre_tokens, post_tokens):
+    for mint, post_amt in post_tokens.items():
+        diff = post_amt - pre_tokens.get(mint, 0)
+        if diff != 0:
+            yield mint, diff
+
+    # توکن‌هایی که کل موجودی‌شان فروخته شده در post نیستند
+    for mint, pre_amt in pre_tokens.items():
+        if mint not in post_tokens and pre_amt != 0:
+            yield mint, -pre_amt
+
+def build_trade_messages(wallet, sig, tx):
+    meta = tx["meta"]
+
+    # مثبت یعنی SOL وارد والت شده (فروش)، منفی یعنی خارج شده (خرید)
+    lamports = meta["postBalances"][0] - meta["preBalances"][0]
+    if abs(lamports) < _min_lamports:
+        return []
+
+    sol_change = lamports / 1e9
+
+    pre_tokens = token_amounts(meta.get("preTokenBalances", []), wallet)
+    post_tokens = token_amounts(meta.get("postTokenBalances", []), wallet)
+
+    messages = []
+    for mint, diff in token_changes(pre_tokens, post_tokens):
+        if sol_change > 0 and diff < 0:
+            action = "🔴 SELL"
+        elif sol_change < 0 and diff > 0:
+            action = "🟢 BUY"
+        else:
+            continue
+
+        messages.append(_format_trade(
+            action=action,
+            wallet=wallet,
+            mint=mint,
+            amount=abs(diff),
+            sol=abs(sol_change),
+            sig=sig,
+        ))
+
+    return messages
+
+async def send_message(bot, chat_id, text):
+    async with _send_semaphore:
+        return await bot.send_message(
+            chat_id=chat_id,
+            text=text,
+            parse_mode="Markdown"
+        )
+
+async def send_messages(bot, chat_id, messages):
+    # ارسال‌ها موازی انجام می‌شوند، نه یکی‌یکی
+    results = await asyncio.gather(
+        *(send_message(bot, chat_id, text) for text in messages),
+        return_exceptions=True
     )
 
+    for result in results:
+        if isinstance(result, Exception):
+            print("Trade monitor send error:", result)
+
 async def monitor(wallets, bot, chat_id):
+    next_tick = time.monotonic()
+    woken = False
+
     while True:
-        for wallet in wallets():
-            try:
-                sigs = get_signatures(wallet)
-                if not sigs:
-                    continue
-
-                sig = sigs[0]["signature"]
-                if last_signatures.get(wallet) == sig:
-                    continue
-
-                last_signatures[wallet] = sig
-                tx = get_transaction(sig)
-                if not tx or not tx.get("meta"):
-                    continue
-
-                meta = tx["meta"]
-
-                sol_change = (
-                    meta["preBalances"][0] - meta["postBalances"][0]
-                ) / 1e9
-
-                if abs(sol_change) < MIN_SOL:
-                    continue
-
-                pre_tokens = {
-                    t["mint"]: float(t["uiTokenAmount"]["uiAmount"] or 0)
-                    for t in meta.get("preTokenBalances", [])
-                }
-
-                post_tokens = {
-                    t["mint"]: float(t["uiTokenAmount"]["uiAmount"] or 0)
-                    for t in meta.get("postTokenBalances", [])
-                }
-
-                for mint, post_amt in post_tokens.items():
-                    pre_amt = pre_tokens.get(mint, 0)
-                    diff = post_amt - pre_amt
-
-                    if diff == 0:
-                        continue
-
-                    if sol_change > 0 and diff < 0:
-                        action = "🔴 SELL"
-                    elif sol_change < 0 and diff > 0:
-                        action = "🟢 BUY"
-                    else:
-                        continue
-
-                    text = (
-                        f"{action} **Solana Trade**\n\n"
-                        f"Wallet:\n`{wallet}`\n\n"
-                        f"Token Mint:\n`{mint}`\n"
-                        f"Token Amount: {abs(diff):,.2f}\n"
-                        f"SOL Change: {abs(sol_change):.2f} SOL\n\n"
-                        f"🔗 Links:\n"
-                        f"Solscan: https://solscan.io/tx/{sig}\n"
-                        f"GMGN: https://gmgn.ai/sol/token/{mint}\n"
-                        f"HyperDash: https://hyperdash.info/solana/token/{mint}"
-                    )
-
-                    await bot.send_message(
-                        chat_id=chat_id,
-                        text=text,
-                        parse_mode="Markdown"
-                    )
+        # همه والت‌ها همزمان روی یک event loop چک می‌شوند
+        try:
+            current = wallets()
+        except Exception as e:
+            # خطای فایل والت‌ها فقط همین دور را رد می‌کند، نه کل مانیتور را
+            print("Trade monitor wallets error:", e)
+            current = ()
+
+        if not current:
+            # والتی نیست؛ درخواست RPC نمی‌زنیم ولی هر CHECK_INTERVAL فایل والت‌ها دوباره چک می‌شود
+            await wait_next_cycle(CHECK_INTERVAL)
+            next_tick = time.monotonic()
+            continue
+
+        prune_last_signatures(current)
+        cycle_start = time.monotonic()
+        results = await asyncio.gather(
+            *(fetch_latest_trade(wallet) for wallet in current)
+        )
+
+        messages = []
+        for wallet, result in zip(current, results):
+            if not result:
+                continue
 
+            try:
+                messages.extend(build_trade_messages(wallet, *result))
             except Exception as e:
                 print("Trade monitor error:", e)
 
-        await asyncio.sleep(CHECK_INTERVAL)
+        if messages:
+            await send_messages(bot, chat_id, messages)
+
+        # زمان‌بندی روی شبکه ثابت monotonic؛ دورها عقب نمی‌افتند و روی هم نمی‌روند
+        next_tick += CHECK_INTERVAL
+        # بعد از دور زودهنگام (wake) شبکه از همین دور دوباره شروع می‌شود تا دور بعدی جا نیفتد
+        if woken or next_tick - time.monotonic() > CHECK_INTERVAL:
+            next_tick = cycle_start + CHECK_INTERVAL
+        delay = next_tick - time.monotonic()
+        if delay <= 0:
+            next_tick = time.monotonic()
+            delay = 0
+        woken = await wait_next_cycle(delay)
@@ -1,15 +1,29 @@
+import asyncio
+import math
+import re
+
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from wallet_store import add_wallet, remove_wallet, get_wallets
+from solana_trade_monitor import get_min_sol, set_min_sol, wake
+
+# آدرس سولانا: base58 با طول 32 تا 44 کاراکتر (حساس به حروف بزرگ و کوچک)
+SOLANA_ADDRESS_RE = re.compile(r"[1-9A-HJ-NP-Za-km-z]{32,44}")
 
 async def addwallet(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args:
         await update.message.reply_text("❌ آدرس وارد نشده")
         return
 
-    wallet = context.args[0]
-    if add_wallet(context, wallet):
+    wallet = context.args[0].strip()
+    if not SOLANA_ADDRESS_RE.fullmatch(wallet):
+        await update.message.reply_text("❌ آدرس نامعتبر است")
+        return
+
+    # نوشتن فایل روی thread جدا تا event loop بلاک نشود
+    if await asyncio.to_thread(add_wallet, wallet):
+        wake()
         await update.message.reply_text(f"✅ Wallet اضافه شد:\n{wallet}")
     else:
         await update.message.reply_text("⚠️ Wallet قبلاً وجود دارد")
@@ -20,13 +34,13 @@ async def removewallet(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     wallet = context.args[0]
-    if remove_wallet(context, wallet):
+    if await asyncio.to_thread(remove_wallet, wallet):
         await update.message.reply_text(f"🗑 Wallet حذف شد:\n{wallet}")
     else:
         await update.message.reply_text("⚠️ Wallet پیدا نشد")
 
 async def wallets(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    wallets = get_wallets(context)
+    wallets = get_wallets()
     if not wallets:
         await update.message.reply_text("📭 هیچ Walletای ثبت نشده")
         return
@@ -35,10 +49,35 @@ async def wallets(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "📌 Wallets:\n\n" + "\n".join(wallets)
     )
 
+async def threshold(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        await update.message.reply_text(
+            f"⚙️ حداقل تغییر SOL: {get_min_sol()}"
+        )
+        return
+
+    try:
+        value = float(context.args[0])
+    except ValueError:
+        await update.message.reply_text("❌ عدد نامعتبر است")
+        return
+
+    if not math.isfinite(value) or value < 0:
+        await update.message.reply_text("❌ عدد نامعتبر است")
+        return
+
+    set_min_sol(value)
+    await update.message.reply_text(f"✅ حداقل تغییر SOL: {value}")
+
 async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    wallets = get_wallets(context)
+    wallets = get_wallets()
     await update.message.reply_text(
         f"📊 Status\n"
         f"Wallets: {len(wallets)}\n"
         f"Network: Solana"
     )
+
+async def refresh(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # مانیتور همین حالا یک دور چک می‌کند
+    wake()
+    await update.message.reply_text("🔄 بررسی والت‌ها شروع شد")
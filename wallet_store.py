@@ -2,6 +2,11 @@ import json
 import os
 from threading import Lock
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 FILE_PATH = "wallets.json"
 _lock = Lock()
 
@@ -11,36 +16,105 @@ def _load():
         return []
 
     try:
-        with open(FILE_PATH, "r") as f:
-            return json.load(f)
+        with open(FILE_PATH, "rb") as f:
+            data = _loads(f.read())
     except Exception:
-        return []
+        return None
+
+    # ویرایش دستی ممکن است JSON معتبر ولی غیر از لیست رشته‌ها بگذارد
+    if not isinstance(data, list) or not all(isinstance(w, str) for w in data):
+        return None
+    return data
+
+
+def _loads(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+
+def _mtime():
+    try:
+        return os.stat(FILE_PATH).st_mtime_ns
+    except OSError:
+        return None
 
 
 def _save(wallets):
-    with open(FILE_PATH, "w") as f:
-        json.dump(wallets, f, indent=2)
+    global _mtime_ns
+    # اول فایل موقت، بعد جایگزینی اتمیک تا فایل نیمه‌کاره نماند
+    tmp_path = FILE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_dumps(wallets))
+        # داده قبل از rename روی دیسک برود تا پس از قطع برق فایل خالی نماند
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, FILE_PATH)
+    _mtime_ns = _mtime()
+
+
+def _reload():
+    global _wallets, _wallet_set, _wallets_snapshot, _mtime_ns
+    mtime_ns = _mtime()
+    wallets = _load()
+    if wallets is None:
+        # فایل خراب یا نیمه‌نوشته است؛ کش قبلی می‌ماند و دفعه بعد دوباره خوانده می‌شود
+        return
+
+    _wallets = wallets
+    _wallet_set = set(wallets)
+    # اسنپ‌شات فقط‌خواندنی برای مانیتور و دستورها؛ بدون کپی در هر فراخوانی
+    _wallets_snapshot = tuple(wallets)
+    _mtime_ns = mtime_ns
+
+
+def _refresh():
+    # فایل فقط وقتی دوباره خوانده می‌شود که از بیرون (مثلاً دستی) تغییر کرده باشد
+    if _mtime() != _mtime_ns:
+        with _lock:
+            if _mtime() != _mtime_ns:
+                _reload()
+
+
+_wallets = []
+_wallet_set = set()
+_wallets_snapshot = ()
+_mtime_ns = None
+_reload()
 
 
 def add_wallet(address: str) -> bool:
+    global _wallets_snapshot
+    _refresh()
     with _lock:
-        wallets = _load()
-        if address in wallets:
+        if address in _wallet_set:
             return False
-        wallets.append(address)
-        _save(wallets)
+        _wallet_set.add(address)
+        _wallets.append(address)
+        _save(_wallets)
+        _wallets_snapshot = tuple(_wallets)
         return True
 
 
 def remove_wallet(address: str) -> bool:
+    global _wallets_snapshot
+    _refresh()
     with _lock:
-        wallets = _load()
-        if address not in wallets:
+        if address not in _wallet_set:
             return False
-        wallets.remove(address)
-        _save(wallets)
+        _wallet_set.discard(address)
+        _wallets.remove(address)
+        _save(_wallets)
+        _wallets_snapshot = tuple(_wallets)
         return True
 
 
 def get_wallets():
-    return _load()
+    _refresh()
+    return _wallets_snapshot